@@ -2,7 +2,9 @@ from django.contrib import admin
 
 # Register your models here.
 from django.contrib import admin
-from .models import UserProfile, Lesson, Video, LikeLesson, DislikeLesson, Comment, View
+from .models import (UserProfile, Lesson, Video, LikeLesson, DislikeLesson, Comment, View, LessonSimilarity,
+                     LessonStatHourly, LessonStatDaily, RollupWatermark, PendingFileDeletion, Follow,
+                     NotificationEvent, NotificationCursor)
 
 
 class UserProfileAdmin(admin.ModelAdmin):
@@ -27,7 +29,8 @@ class ViewInline(admin.TabularInline):
 
 
 class LessonAdmin(admin.ModelAdmin):
-    list_display = ('title', 'user', 'created', 'update', 'likes_count', 'dislikes_count', 'views_count')
+    list_display = ('title', 'user', 'created', 'update', 'is_deleted', 'likes_count', 'dislikes_count', 'views_count')
+    list_filter = ('is_deleted',)
     search_fields = ('title', 'user__username')
     inlines = [VideoInline, CommentInline, ViewInline]
 
@@ -69,6 +72,45 @@ class ViewAdmin(admin.ModelAdmin):
     search_fields = ('lesson__title', 'user__username')
 
 
+class LessonSimilarityAdmin(admin.ModelAdmin):
+    list_display = ('lesson', 'neighbor', 'score', 'created')
+    search_fields = ('lesson__title', 'neighbor__title')
+    raw_id_fields = ('lesson', 'neighbor')
+
+
+class LessonStatAdmin(admin.ModelAdmin):
+    list_display = ('lesson', 'bucket', 'views', 'likes', 'dislikes', 'comments')
+    search_fields = ('lesson__title',)
+    raw_id_fields = ('lesson',)
+
+
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('name', 'last_id', 'updated')
+
+
+class PendingFileDeletionAdmin(admin.ModelAdmin):
+    list_display = ('name', 'created')
+    search_fields = ('name',)
+
+
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('follower', 'author', 'created')
+    search_fields = ('follower__username', 'author__username')
+    raw_id_fields = ('follower', 'author')
+
+
+class NotificationEventAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'actor', 'recipient', 'lesson', 'created')
+    list_filter = ('kind',)
+    search_fields = ('actor__username', 'lesson__title')
+    raw_id_fields = ('actor', 'recipient', 'lesson', 'comment')
+
+
+class NotificationCursorAdmin(admin.ModelAdmin):
+    list_display = ('user', 'last_read_id', 'updated')
+    search_fields = ('user__username',)
+
+
 admin.site.register(UserProfile, UserProfileAdmin)
 admin.site.register(Lesson, LessonAdmin)
 admin.site.register(Video, VideoAdmin)
@@ -76,3 +118,11 @@ admin.site.register(LikeLesson, LikeLessonAdmin)
 admin.site.register(DislikeLesson, DislikeLessonAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(View, ViewAdmin)
+admin.site.register(LessonSimilarity, LessonSimilarityAdmin)
+admin.site.register(LessonStatHourly, LessonStatAdmin)
+admin.site.register(LessonStatDaily, LessonStatAdmin)
+admin.site.register(RollupWatermark, RollupWatermarkAdmin)
+admin.site.register(PendingFileDeletion, PendingFileDeletionAdmin)
+admin.site.register(Follow, FollowAdmin)
+admin.site.register(NotificationEvent, NotificationEventAdmin)
+admin.site.register(NotificationCursor, NotificationCursorAdmin)
@@ -0,0 +1,127 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from .models import View, LikeLesson, DislikeLesson, Comment, LessonStatHourly, LessonStatDaily, RollupWatermark
+
+# counter field on the bucket tables -> (source model, timestamp field)
+SOURCES = {
+    'views': (View, 'viewed_at'),
+    'likes': (LikeLesson, 'created_time'),
+    'dislikes': (DislikeLesson, 'created_time'),
+    'comments': (Comment, 'created_at'),
+}
+
+GRANULARITIES = (
+    (LessonStatHourly, TruncHour),
+    (LessonStatDaily, TruncDate),
+)
+
+
+def _aggregate(queryset, time_field, trunc):
+    return (
+        queryset.filter(lesson__isnull=False)
+        .annotate(period=trunc(time_field))
+        .values_list('lesson_id', 'period')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+
+
+def _add_counts(model, counter, rows):
+    """Add ``(lesson_id, bucket, total)`` rows onto the ``counter`` column of ``model``."""
+    rows = list(rows)
+    if not rows:
+        return
+    existing = {
+        (stat.lesson_id, stat.bucket): stat
+        for stat in model.objects.filter(
+            lesson_id__in={lesson_id for lesson_id, _, _ in rows},
+            bucket__in={bucket for _, bucket, _ in rows},
+        )
+    }
+    created, updated = [], []
+    for lesson_id, bucket, total in rows:
+        stat = existing.get((lesson_id, bucket))
+        if stat is None:
+            created.append(model(lesson_id=lesson_id, bucket=bucket, **{counter: total}))
+        else:
+            setattr(stat, counter, getattr(stat, counter) + total)
+            updated.append(stat)
+    # Runs for other counters may insert the same (lesson, bucket) concurrently;
+    # on conflict only this counter's column is written, so neither run is lost.
+    model.objects.bulk_create(
+        created, batch_size=1000,
+        update_conflicts=True, unique_fields=['lesson', 'bucket'], update_fields=[counter],
+    )
+    model.objects.bulk_update(updated, [counter], batch_size=1000)
+
+
+def _rollup_source(counter, batch_size, lag):
+    model, time_field = SOURCES[counter]
+    watermark, _ = RollupWatermark.objects.get_or_create(name=counter)
+    # Rows younger than ``lag`` are left for the next run so that transactions
+    # still in flight with lower ids are not skipped past.
+    upper = model.objects.filter(
+        pk__gt=watermark.last_id, **{f'{time_field}__lt': timezone.now() - lag}
+    ).aggregate(value=Max('pk'))['value']
+    if upper is None:
+        return 0
+
+    processed = 0
+    while True:
+        with transaction.atomic():
+            watermark = RollupWatermark.objects.select_for_update().get(pk=watermark.pk)
+            if watermark.last_id >= upper:
+                return processed
+            window_end = min(watermark.last_id + batch_size, upper)
+            rows = model.objects.filter(pk__gt=watermark.last_id, pk__lte=window_end)
+            for stat_model, trunc in GRANULARITIES:
+                _add_counts(stat_model, counter, _aggregate(rows, time_field, trunc))
+            processed += rows.count()
+            watermark.last_id = window_end
+            watermark.save(update_fields=['last_id', 'updated'])
+
+
+def rollup_lesson_stats(batch_size=None, lag=None):
+    """Fold rows created since the last run into the hourly and daily buckets.
+
+    Each source table keeps its own id watermark, so a run only reads rows it
+    has not counted yet. Rollups count recorded events: an unlike that deletes
+    a ``LikeLesson`` row is only reflected after ``rebuild_lesson_stats``.
+    Returns the number of source rows processed per counter.
+    """
+    batch_size = batch_size or settings.ANALYTICS_ROLLUP_BATCH_SIZE
+    if lag is None:
+        lag = settings.ANALYTICS_ROLLUP_LAG
+    return {counter: _rollup_source(counter, batch_size, lag) for counter in SOURCES}
+
+
+def rebuild_lesson_stats(start, end):
+    """Recompute the buckets for the dates ``start``..``end`` (inclusive) from the raw rows.
+
+    Only rows at or below the current watermarks are counted, so the rebuilt
+    range stays consistent with what the incremental job will add later.
+    """
+    tz = timezone.get_current_timezone()
+    range_start = datetime.combine(start, time.min, tzinfo=tz)
+    range_end = datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz)
+
+    with transaction.atomic():
+        watermarks = {
+            watermark.name: watermark.last_id
+            for watermark in RollupWatermark.objects.select_for_update().filter(name__in=SOURCES)
+        }
+        LessonStatHourly.objects.filter(bucket__gte=range_start, bucket__lt=range_end).delete()
+        LessonStatDaily.objects.filter(bucket__gte=start, bucket__lte=end).delete()
+        for counter, (model, time_field) in SOURCES.items():
+            rows = model.objects.filter(
+                pk__lte=watermarks.get(counter, 0),
+                **{f'{time_field}__gte': range_start, f'{time_field}__lt': range_end},
+            )
+            for stat_model, trunc in GRANULARITIES:
+                _add_counts(stat_model, counter, _aggregate(rows, time_field, trunc))
@@ -0,0 +1,307 @@
+"""Live lesson engagement counters over Server-Sent Events.
+
+Changes to likes, dislikes, views and comments publish the lesson id on a
+broker channel. Each process keeps one ``LessonCounterHub``; for every lesson
+that has watchers it reads the counts at most once per
+``LIVE_COUNTER_INTERVAL`` seconds and hands the change to all of them, so the
+database cost does not grow with the number of connected clients.
+
+``LocalBroker`` only reaches subscribers in the same process and is what the
+development server and tests use. ``RedisBroker`` fans changes out across
+processes; select it with ``LIVE_BROKER``.
+"""
+import asyncio
+import functools
+import json
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.module_loading import import_string
+
+from .models import Lesson, LikeLesson, DislikeLesson, View, Comment
+
+
+class LocalBroker:
+    """In-process pub/sub. ``publish`` may be called from any thread."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers[channel])
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:
+                # The subscriber's event loop is already closed.
+                pass
+
+    async def subscribe(self, channel):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+        try:
+            while True:
+                yield await subscriber[1].get()
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+
+class RedisBroker:
+    """Pub/sub over Redis (or any server speaking its protocol). Needs the ``redis`` package."""
+
+    def __init__(self, url='redis://localhost:6379/0'):
+        import redis
+
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, channel, message):
+        self._client.publish(channel, message)
+
+    async def subscribe(self, channel):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            async for item in pubsub.listen():
+                if item['type'] == 'message':
+                    yield item['data'].decode()
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+            await client.aclose()
+
+
+@functools.lru_cache(maxsize=None)
+def get_broker():
+    broker_class = import_string(settings.LIVE_BROKER)
+    return broker_class(**settings.LIVE_BROKER_OPTIONS)
+
+
+def lesson_channel(lesson_id):
+    return f'lesson:{lesson_id}'
+
+
+def publish_lesson_change(lesson_id):
+    """Tell watchers of ``lesson_id`` that its counters changed, once the transaction commits."""
+    if lesson_id is None:
+        return
+    transaction.on_commit(lambda: get_broker().publish(lesson_channel(lesson_id), 'changed'))
+
+
+def _count(model, **filters):
+    counts = (
+        model.objects.filter(lesson=OuterRef('pk'), **filters)
+        .order_by()
+        .values('lesson')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+COUNTERS = ('likes', 'dislikes', 'views', 'comments')
+
+
+def lesson_counts(lesson_id):
+    """Current counters for a lesson in one query, or None if the lesson is gone."""
+    row = Lesson.objects.filter(pk=lesson_id).values_list(
+        _count(LikeLesson),
+        _count(DislikeLesson),
+        _count(View),
+        _count(Comment, is_deleted=False),
+    ).first()
+    return dict(zip(COUNTERS, row)) if row else None
+
+
+class _Watcher:
+    """One connected client. Updates it has not consumed yet are merged."""
+
+    def __init__(self):
+        self._counts = None
+        self._delta = {}
+        self._ready = asyncio.Event()
+        self.closed = False
+
+    def push(self, counts, delta):
+        self._counts = counts
+        for name, change in delta.items():
+            self._delta[name] = self._delta.get(name, 0) + change
+        self._ready.set()
+
+    def close(self):
+        """End the stream, e.g. because the lesson was deleted."""
+        self.closed = True
+        self._ready.set()
+
+    async def get(self):
+        """Return the merged update, or None once the watcher was closed."""
+        await self._ready.wait()
+        self._ready.clear()
+        if self.closed:
+            return None
+        event = {'counts': self._counts, 'delta': self._delta}
+        self._delta = {}
+        return event
+
+
+class _LessonFeed:
+    """Broker subscription and debounced count reads for a single lesson."""
+
+    def __init__(self, lesson_id, broker, interval):
+        self.lesson_id = lesson_id
+        self.interval = interval
+        self.watchers = set()
+        self.counts = None
+        self._loop = asyncio.get_running_loop()
+        self._lock = asyncio.Lock()
+        self._pending = False
+        self._last_read = float('-inf')
+        self._flush_handle = None
+        self._flush_task = None
+        self._listener = asyncio.ensure_future(self._listen(broker))
+
+    async def _listen(self, broker):
+        async for _ in broker.subscribe(lesson_channel(self.lesson_id)):
+            self._schedule()
+
+    def _schedule(self):
+        if self._pending:
+            return
+        self._pending = True
+        delay = max(0.0, self._last_read + self.interval - self._loop.time())
+        self._flush_handle = self._loop.call_later(delay, self._start_flush)
+
+    def _start_flush(self):
+        self._flush_task = asyncio.ensure_future(self._flush())
+
+    async def _read(self):
+        self._last_read = self._loop.time()
+        return await sync_to_async(lesson_counts)(self.lesson_id)
+
+    async def snapshot(self):
+        async with self._lock:
+            if self.counts is None:
+                self.counts = await self._read()
+            return self.counts
+
+    async def _flush(self):
+        # Cleared before reading so that a change arriving mid-read schedules the next interval.
+        self._pending = False
+        async with self._lock:
+            counts = await self._read()
+            if counts is None:
+                # The lesson is gone; end every stream instead of idling on keep-alives.
+                for watcher in self.watchers:
+                    watcher.close()
+                return
+            if self.counts is None:
+                self.counts = counts
+                return
+            delta = {name: value - self.counts[name] for name, value in counts.items() if value != self.counts[name]}
+            self.counts = counts
+        if delta:
+            for watcher in self.watchers:
+                watcher.push(counts, delta)
+
+    def close(self):
+        self._listener.cancel()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+
+
+class LessonCounterHub:
+    def __init__(self, broker, interval):
+        self.broker = broker
+        self.interval = interval
+        self._feeds = {}
+
+    async def watch(self, lesson_id, heartbeat):
+        """Yield the current counts, then one coalesced update per interval while anything changes.
+
+        ``None`` is yielded after ``heartbeat`` idle seconds so the caller can keep the connection open.
+        The generator returns when the lesson is deleted.
+        """
+        feed = self._feeds.get(lesson_id)
+        if feed is None:
+            feed = self._feeds[lesson_id] = _LessonFeed(lesson_id, self.broker, self.interval)
+        watcher = _Watcher()
+        feed.watchers.add(watcher)
+        try:
+            counts = await feed.snapshot()
+            if counts is None:
+                return
+            yield {'counts': counts, 'delta': {}}
+            while True:
+                try:
+                    event = await asyncio.wait_for(watcher.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            feed.watchers.discard(watcher)
+            if not feed.watchers and self._feeds.get(lesson_id) is feed:
+                del self._feeds[lesson_id]
+                feed.close()
+
+
+@functools.lru_cache(maxsize=None)
+def get_hub():
+    return LessonCounterHub(get_broker(), settings.LIVE_COUNTER_INTERVAL)
+
+
+async def _authenticate(request):
+    user = await request.auser()
+    if user.is_authenticated:
+        return user
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return user
+    return result[0] if result else user
+
+
+async def _event_stream(lesson_id):
+    heartbeat = settings.LIVE_HEARTBEAT_INTERVAL
+    yield 'retry: 3000\n\n'
+    async for event in get_hub().watch(lesson_id, heartbeat):
+        if event is None:
+            yield ': keep-alive\n\n'
+        else:
+            yield f'event: counts\ndata: {json.dumps({"lesson": lesson_id, **event})}\n\n'
+
+
+async def lesson_counters_stream(request, pk):
+    """SSE feed of like/dislike/view/comment counts for one lesson. Must be served over ASGI."""
+    user = await _authenticate(request)
+    if not user.is_authenticated:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    if not await Lesson.objects.filter(pk=pk, is_deleted=False).aexists():
+        return JsonResponse({'error': 'Lesson not found.'}, status=404)
+
+    response = StreamingHttpResponse(_event_stream(pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,99 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker does before serving its first request.
+STARTUP_SNIPPET = (
+    'import django; django.setup(); '
+    'from django.urls import get_resolver; get_resolver().url_patterns'
+)
+
+
+def parse_importtime(stderr):
+    """Return ``(total_self_us, {module: cumulative_us})`` from ``-X importtime`` output."""
+    total = 0
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        total += int(self_us)
+        modules[name.strip()] = int(cumulative_us)
+    return total, modules
+
+
+class Command(BaseCommand):
+    help = ('Measure cold startup import time (python -X importtime) for a settings module '
+            'and record it under benchmarks/importtime/<release>.json.')
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--release', default='dev', help='Name the result is stored under, e.g. a version tag.')
+        parser.add_argument('--settings-module', default=os.environ.get('DJANGO_SETTINGS_MODULE'),
+                            help='Settings module the worker is started with.')
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to measure; the median is kept.')
+        parser.add_argument('--top', type=int, default=15, help='Slowest modules to record.')
+        parser.add_argument('--output-dir', default=str(settings.BASE_DIR / 'benchmarks' / 'importtime'))
+
+    def measure(self, settings_module):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module}
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SNIPPET],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        wall_us = int((time.perf_counter() - started) * 1_000_000)
+        if result.returncode != 0:
+            raise CommandError(f'Startup failed:\n{result.stderr[-2000:]}')
+        total_us, modules = parse_importtime(result.stderr)
+        return {'wall_us': wall_us, 'import_us': total_us, 'modules': modules}
+
+    def handle(self, *args, **options):
+        runs = [self.measure(options['settings_module']) for _ in range(options['runs'])]
+        median = sorted(runs, key=lambda run: run['import_us'])[len(runs) // 2]
+        slowest = sorted(median['modules'].items(), key=lambda item: item[1], reverse=True)
+
+        report = {
+            'release': options['release'],
+            'settings': options['settings_module'],
+            'python': platform.python_version(),
+            'runs': len(runs),
+            'import_ms': round(median['import_us'] / 1000, 1),
+            'wall_ms': round(statistics.median(run['wall_us'] for run in runs) / 1000, 1),
+            'module_count': len(median['modules']),
+            'slowest_modules_ms': {name: round(us / 1000, 1) for name, us in slowest[:options['top']]},
+        }
+
+        os.makedirs(options['output_dir'], exist_ok=True)
+        previous = self.latest_report(options['output_dir'], exclude=options['release'])
+        path = os.path.join(options['output_dir'], f"{options['release']}.json")
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+
+        self.stdout.write(f"Imports: {report['import_ms']} ms across {report['module_count']} modules, "
+                          f"process wall time {report['wall_ms']} ms.")
+        for name, ms in report['slowest_modules_ms'].items():
+            self.stdout.write(f'  {ms:>8.1f} ms  {name}')
+        if previous:
+            delta = report['import_ms'] - previous['import_ms']
+            self.stdout.write(f"Compared to {previous['release']}: {delta:+.1f} ms.")
+        self.stdout.write(self.style.SUCCESS(f'Saved {path}'))
+
+    @staticmethod
+    def latest_report(directory, exclude):
+        reports = [
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.endswith('.json') and name != f'{exclude}.json'
+        ]
+        if not reports:
+            return None
+        with open(max(reports, key=os.path.getmtime)) as f:
+            return json.load(f)
@@ -0,0 +1,58 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from app.models import Lesson, Follow, NotificationEvent
+from app.notifications import inbox_for, unread_count, mark_read
+
+
+class Command(BaseCommand):
+    help = ('Benchmark notification fan-out: one author with N followers publishes a lesson, '
+            'then a follower reads the inbox. All rows are rolled back afterwards.')
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--followers', type=int, default=100000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def timed(self, label, func):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            result = func()
+            elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(f'{label:<32} {elapsed:>9.2f} ms  {len(queries):>3} queries')
+        return result
+
+    def handle(self, *args, **options):
+        followers = options['followers']
+        batch_size = options['batch_size']
+
+        with transaction.atomic():
+            author = User.objects.create(username='bench-fanout-author')
+            started = time.perf_counter()
+            users = User.objects.bulk_create(
+                [User(username=f'bench-fanout-{i}') for i in range(followers)], batch_size=batch_size,
+            )
+            Follow.objects.bulk_create(
+                [Follow(follower=user, author=author) for user in users], batch_size=batch_size,
+            )
+            self.stdout.write(f'Set up {followers} followers in {time.perf_counter() - started:.1f}s.')
+
+            events_before = NotificationEvent.objects.count()
+            self.timed('publish lesson', lambda: Lesson.objects.create(user=author, title='Fan-out benchmark'))
+            self.stdout.write(f'{"event rows written":<32} {NotificationEvent.objects.count() - events_before:>9}')
+
+            reader = users[-1]
+            cache.delete(f'notifications:unread:{reader.pk}')
+            self.timed('inbox first page', lambda: list(inbox_for(reader).order_by('-pk')[:20]))
+            self.timed('unread count (cold)', lambda: unread_count(reader))
+            self.timed('unread count (cached)', lambda: unread_count(reader))
+            self.timed('mark read', lambda: mark_read(reader))
+
+            transaction.set_rollback(True)
+        cache.delete(f'notifications:unread:{reader.pk}')
+        self.stdout.write(self.style.SUCCESS('Benchmark rows rolled back.'))
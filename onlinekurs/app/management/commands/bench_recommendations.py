@@ -0,0 +1,63 @@
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.models import Lesson, View, LessonSimilarity
+from app.recommendations import rebuild_lesson_similarities
+
+
+class Command(BaseCommand):
+    help = ('Benchmark the similarity build on synthetic views: time and peak traced memory '
+            'of rebuild_lesson_similarities. All rows are rolled back afterwards.')
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interactions', type=int, default=1000000, help='View rows to generate, e.g. 10000000.')
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--lessons', type=int, default=5000)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--chunk-size', type=int, help='Passed through to the build.')
+
+    def handle(self, *args, **options):
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        batch_size = options['batch_size']
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            users = User.objects.bulk_create(
+                [User(username=f'bench-rec-{i}') for i in range(options['users'])], batch_size=batch_size,
+            )
+            lessons = Lesson.objects.bulk_create(
+                [Lesson(title=f'bench-rec-{i}') for i in range(options['lessons'])], batch_size=batch_size,
+            )
+            user_ids = np.array([user.pk for user in users])
+            # Skewed popularity, like real traffic: a few lessons get most of the views.
+            lesson_ids = np.array([lesson.pk for lesson in lessons])
+            popularity = 1.0 / np.arange(1, len(lesson_ids) + 1)
+            popularity /= popularity.sum()
+            for start in range(0, options['interactions'], batch_size):
+                size = min(batch_size, options['interactions'] - start)
+                View.objects.bulk_create([
+                    View(user_id=user_id, lesson_id=lesson_id)
+                    for user_id, lesson_id in zip(
+                        rng.choice(user_ids, size).tolist(), rng.choice(lesson_ids, size, p=popularity).tolist(),
+                    )
+                ])
+            self.stdout.write(f"Generated {options['interactions']} views in {time.perf_counter() - started:.1f}s.")
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            written = rebuild_lesson_similarities(chunk_size=options['chunk_size'])
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.stdout.write(f'Stored {LessonSimilarity.objects.count()} neighbors ({written} written) '
+                              f'in {elapsed:.1f}s, peak traced memory {peak / 1024 / 1024:.1f} MB.')
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Benchmark rows rolled back.'))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.recommendations import rebuild_lesson_similarities
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the lesson-to-lesson similarity table used by the recommendation endpoints. Run it periodically (e.g. from cron).'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, help='Neighbors stored per lesson.')
+        parser.add_argument('--chunk-size', type=int, help='Interaction rows streamed from the database per chunk.')
+        parser.add_argument('--block-size', type=int, help='Lessons scored per similarity block.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        written = rebuild_lesson_similarities(
+            top_k=options['top_k'],
+            chunk_size=options['chunk_size'],
+            block_size=options['block_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {written} lesson neighbors in {time.monotonic() - started:.1f}s.'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from app.moderation import purge_pending_files, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Delete media files queued by lesson/video deletes. Run it periodically (e.g. from cron).'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Queue rows read per batch.')
+
+    def handle(self, *args, **options):
+        purged = purge_pending_files(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {purged} media files.'))
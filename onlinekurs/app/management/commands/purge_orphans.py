@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from app.moderation import purge_orphans, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Delete videos, likes and dislikes whose lesson is NULL, in batches.'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows deleted per transaction.')
+
+    def handle(self, *args, **options):
+        purged = purge_orphans(batch_size=options['batch_size'])
+        summary = ', '.join(f'{name}: {total}' for name, total in purged.items())
+        self.stdout.write(self.style.SUCCESS(f'Purged orphaned rows ({summary}).'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from app.analytics import rebuild_lesson_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the hourly/daily lesson stat tables for a date range from the raw rows.'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', required=True, help='First day to rebuild (YYYY-MM-DD).')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD), defaults to --start.')
+
+    def handle(self, *args, **options):
+        try:
+            start = parse_date(options['start'])
+            end = parse_date(options['end']) if options['end'] else start
+        except ValueError:
+            start = end = None
+        if start is None or end is None:
+            raise CommandError('Dates must be given as YYYY-MM-DD.')
+        if end < start:
+            raise CommandError('--end must not be before --start.')
+
+        rebuild_lesson_stats(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt lesson stats from {start} to {end}.'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from app.analytics import rollup_lesson_stats
+
+
+class Command(BaseCommand):
+    help = 'Fold new views, likes, dislikes and comments into the hourly/daily lesson stat tables. Run it periodically (e.g. from cron).'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Source rows aggregated per transaction.')
+
+    def handle(self, *args, **options):
+        processed = rollup_lesson_stats(batch_size=options['batch_size'])
+        summary = ', '.join(f'{counter}: {total}' for counter, total in processed.items())
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {summary}.'))
@@ -34,6 +34,7 @@ class Lesson(models.Model):
     description = models.TextField(null=True, blank=True)
     created = models.DateTimeField(auto_now_add=True)
     update = models.DateTimeField(auto_now_add=True)
+    is_deleted = models.BooleanField(default=False, db_index=True)
 
     def __str__(self):
         return self.title
@@ -60,6 +61,7 @@ class Video(models.Model):
     description = models.TextField(null=True, blank=True)
     created = models.DateTimeField(auto_now_add=True)
     update = models.DateTimeField(auto_now_add=True)
+    is_deleted = models.BooleanField(default=False, db_index=True)
 
 
 class LikeLesson(models.Model):
@@ -95,9 +97,11 @@ class DislikeLesson(models.Model):
 class Comment(models.Model):
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='comments')
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='replies')
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    is_deleted = models.BooleanField(default=False, db_index=True)
 
     def __str__(self):
         return f'Comment by {self.user.username} on {self.lesson.title}'
@@ -112,3 +116,112 @@ class View(models.Model):
         return f'View by {self.user.username} on {self.lesson.title}'
 
 
+class LessonSimilarity(models.Model):
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='neighbor_of')
+    score = models.FloatField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('lesson', 'neighbor')
+        indexes = [
+            models.Index(fields=['lesson', '-score']),
+        ]
+
+    def __str__(self):
+        return f'{self.lesson_id} -> {self.neighbor_id} ({self.score:.3f})'
+
+
+class LessonStatBucket(models.Model):
+    views = models.PositiveIntegerField(default=0)
+    likes = models.PositiveIntegerField(default=0)
+    dislikes = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        unique_together = ('lesson', 'bucket')
+
+
+class LessonStatHourly(LessonStatBucket):
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='hourly_stats')
+    bucket = models.DateTimeField()
+
+    class Meta(LessonStatBucket.Meta):
+        pass
+
+
+class LessonStatDaily(LessonStatBucket):
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='daily_stats')
+    bucket = models.DateField()
+
+    class Meta(LessonStatBucket.Meta):
+        pass
+
+
+class RollupWatermark(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.name}: {self.last_id}'
+
+
+class PendingFileDeletion(models.Model):
+    name = models.CharField(max_length=255)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Follow(models.Model):
+    follower = models.ForeignKey(User, on_delete=models.CASCADE, related_name='following')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='followers')
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('follower', 'author')
+
+    def __str__(self):
+        return f'{self.follower_id} follows {self.author_id}'
+
+
+class NotificationEvent(models.Model):
+    NEW_LESSON = 'new_lesson'
+    COMMENT_REPLY = 'comment_reply'
+    NEW_VIDEO = 'new_video'
+    KIND_CHOICES = (
+        (NEW_LESSON, 'New lesson'),
+        (COMMENT_REPLY, 'Comment reply'),
+        (NEW_VIDEO, 'New video'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    actor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_events')
+    # Only set for events addressed to a single user; the others reach their
+    # audience through Follow/LikeLesson when the inbox is read.
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True,
+                                  related_name='direct_notifications')
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='notification_events')
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['actor', 'kind']),
+            models.Index(fields=['lesson', 'kind']),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} by {self.actor_id} on {self.lesson_id}'
+
+
+class NotificationCursor(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='notification_cursor')
+    last_read_id = models.BigIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.user_id}: {self.last_read_id}'
@@ -0,0 +1,135 @@
+import logging
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .live import publish_lesson_change
+from .models import Lesson, Video, LikeLesson, DislikeLesson, Comment, View, NotificationEvent, PendingFileDeletion
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _chunks(ids, size):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def enqueue_file_deletions(names):
+    """Queue stored file names for ``purge_media`` instead of deleting them inline."""
+    PendingFileDeletion.objects.bulk_create(
+        [PendingFileDeletion(name=name) for name in names if name]
+    )
+
+
+def _publish_lessons(lesson_ids):
+    for lesson_id in set(lesson_ids):
+        publish_lesson_change(lesson_id)
+
+
+def _delete_videos(queryset):
+    enqueue_file_deletions(queryset.values_list('video', flat=True))
+    # Nothing references Video and its files are queued above, so skip the
+    # collector and the per-row delete signals.
+    return queryset._raw_delete(queryset.db)
+
+
+def _delete_comments(queryset):
+    # Detaching replies and removing notification events first leaves nothing
+    # for the collector to cascade, so the comments need not be loaded.
+    Comment.objects.filter(parent__in=queryset.values('pk')).update(parent=None)
+    NotificationEvent.objects.filter(comment__in=queryset.values('pk')).delete()
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_lessons(ids, batch_size=DEFAULT_BATCH_SIZE):
+    """Delete lessons together with their videos, likes and dislikes, one batch per transaction."""
+    deleted = 0
+    for chunk in _chunks(ids, batch_size):
+        with transaction.atomic():
+            _delete_videos(Video.objects.filter(lesson_id__in=chunk))
+            LikeLesson.objects.filter(lesson_id__in=chunk).delete()
+            DislikeLesson.objects.filter(lesson_id__in=chunk).delete()
+            NotificationEvent.objects.filter(lesson_id__in=chunk).delete()
+            _delete_comments(Comment.objects.filter(lesson_id__in=chunk))
+            View.objects.filter(lesson_id__in=chunk).delete()
+            _, per_model = Lesson.objects.filter(pk__in=chunk).delete()
+            deleted += per_model.get(Lesson._meta.label, 0)
+            _publish_lessons(chunk)
+    return deleted
+
+
+def delete_videos(ids, batch_size=DEFAULT_BATCH_SIZE):
+    deleted = 0
+    for chunk in _chunks(ids, batch_size):
+        with transaction.atomic():
+            deleted += _delete_videos(Video.objects.filter(pk__in=chunk))
+    return deleted
+
+
+def delete_comments(ids, batch_size=DEFAULT_BATCH_SIZE):
+    deleted = 0
+    for chunk in _chunks(ids, batch_size):
+        with transaction.atomic():
+            queryset = Comment.objects.filter(pk__in=chunk)
+            lesson_ids = list(queryset.values_list('lesson_id', flat=True).distinct())
+            deleted += _delete_comments(queryset)
+            _publish_lessons(lesson_ids)
+    return deleted
+
+
+def set_deleted(model, ids, is_deleted=True, batch_size=DEFAULT_BATCH_SIZE):
+    """Soft-delete (or restore) rows of ``model`` with a single UPDATE per batch."""
+    updated = 0
+    for chunk in _chunks(ids, batch_size):
+        queryset = model.objects.filter(pk__in=chunk)
+        if model is Lesson:
+            lesson_ids = chunk
+        else:
+            lesson_ids = list(queryset.values_list('lesson_id', flat=True).distinct())
+        updated += queryset.update(is_deleted=is_deleted)
+        _publish_lessons(lesson_ids)
+    return updated
+
+
+def purge_orphans(batch_size=DEFAULT_BATCH_SIZE):
+    """Remove videos, likes and dislikes left with ``lesson IS NULL`` by earlier lesson deletes."""
+    purged = {}
+    for model in (Video, LikeLesson, DislikeLesson):
+        purged[model.__name__] = 0
+        while True:
+            with transaction.atomic():
+                chunk = list(
+                    model.objects.filter(lesson__isnull=True).order_by('pk').values_list('pk', flat=True)[:batch_size]
+                )
+                if not chunk:
+                    break
+                queryset = model.objects.filter(pk__in=chunk)
+                if model is Video:
+                    purged[model.__name__] += _delete_videos(queryset)
+                else:
+                    purged[model.__name__] += queryset.delete()[0]
+    return purged
+
+
+def purge_pending_files(batch_size=DEFAULT_BATCH_SIZE):
+    """Delete queued media files from storage. Failed files stay queued for the next run."""
+    purged = 0
+    last_pk = 0
+    while True:
+        pending = list(PendingFileDeletion.objects.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+        if not pending:
+            return purged
+        done = []
+        for item in pending:
+            try:
+                default_storage.delete(item.name)
+            except Exception:
+                logger.exception('Could not delete media file %s', item.name)
+            else:
+                done.append(item.pk)
+        PendingFileDeletion.objects.filter(pk__in=done).delete()
+        purged += len(done)
+        last_pk = pending[-1].pk
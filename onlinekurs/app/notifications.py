@@ -0,0 +1,74 @@
+"""In-app notifications, fanned out on read.
+
+Every event is written once to ``NotificationEvent``. A user's inbox is the
+merge, at read time, of events from followed authors, new videos in liked
+lessons and replies addressed to them, so a post by an author with many
+followers still costs a single insert. ``NotificationCursor`` stores the last
+event id the user has read.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Follow, LikeLesson, NotificationEvent, NotificationCursor
+
+
+def _unread_cache_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def inbox_for(user):
+    # Only events created after the follow or like count, so a new follow does
+    # not surface the author's whole back catalogue as unread.
+    followed = Follow.objects.filter(follower=user, author=OuterRef('actor'), created__lte=OuterRef('created'))
+    liked = LikeLesson.objects.filter(user=user, lesson=OuterRef('lesson'), created_time__lte=OuterRef('created'))
+    return NotificationEvent.objects.filter(
+        Q(Exists(followed), kind=NotificationEvent.NEW_LESSON)
+        | Q(Exists(liked), kind=NotificationEvent.NEW_VIDEO)
+        | Q(recipient=user),
+        lesson__is_deleted=False,
+    ).exclude(actor=user)
+
+
+def last_read_id(user):
+    return NotificationCursor.objects.filter(user=user).values_list('last_read_id', flat=True).first() or 0
+
+
+def unread_count(user):
+    """Number of unread events, capped at ``NOTIFICATIONS_UNREAD_LIMIT``.
+
+    The count is cached per user. Direct events and ``mark_read`` clear it;
+    events fanned out to followers are picked up when the cache entry expires.
+    """
+    key = _unread_cache_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        limit = settings.NOTIFICATIONS_UNREAD_LIMIT
+        count = inbox_for(user).filter(pk__gt=last_read_id(user))[:limit].count()
+        cache.set(key, count, settings.NOTIFICATIONS_UNREAD_CACHE_TIMEOUT)
+    return count
+
+
+def mark_read(user, upto_id=None):
+    """Move the user's cursor forward to ``upto_id`` (or to the newest event).
+
+    ``upto_id`` is capped at the newest event in the inbox so that a cursor
+    beyond it cannot hide events that have not been written yet.
+    """
+    newest = inbox_for(user).order_by('-pk').values_list('pk', flat=True).first() or 0
+    upto_id = newest if upto_id is None else min(upto_id, newest)
+    cursor, _ = NotificationCursor.objects.get_or_create(user=user)
+    if upto_id > cursor.last_read_id:
+        cursor.last_read_id = upto_id
+        cursor.save(update_fields=['last_read_id', 'updated'])
+    cache.delete(_unread_cache_key(user.pk))
+    return cursor.last_read_id
+
+
+def record_event(kind, actor, lesson, recipient=None, comment=None):
+    event = NotificationEvent.objects.create(
+        kind=kind, actor=actor, lesson=lesson, recipient=recipient, comment=comment,
+    )
+    if recipient is not None:
+        cache.delete(_unread_cache_key(recipient.pk))
+    return event
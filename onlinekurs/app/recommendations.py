@@ -0,0 +1,135 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from .models import View, LikeLesson, DislikeLesson, LessonSimilarity
+
+VIEW_WEIGHT = 1.0
+LIKE_WEIGHT = 2.0
+
+
+def _interaction_matrix(queryset, shape, weight, chunk_size):
+    """Stream (user_id, lesson_id) pairs into a sparse users x lessons matrix.
+
+    Rows whose ids fall outside ``shape`` were written after the shape was
+    taken and are left for the next build.
+    Rows are read with ``.iterator()`` into fixed-size buffers; each full
+    buffer is kept as a compact coordinate array and the matrix is built once
+    at the end. Peak memory is the coordinates (8 bytes per row while ids fit
+    in int32) plus the resulting matrix.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    index_dtype = np.int32 if max(shape) <= np.iinfo(np.int32).max else np.int64
+    users = np.empty(chunk_size, dtype=index_dtype)
+    lessons = np.empty(chunk_size, dtype=index_dtype)
+    user_chunks, lesson_chunks = [], []
+    size = 0
+
+    rows = queryset.filter(
+        user__isnull=False, lesson__isnull=False, user_id__lt=shape[0], lesson_id__lt=shape[1],
+    ).values_list('user_id', 'lesson_id')
+    for user_id, lesson_id in rows.iterator(chunk_size=chunk_size):
+        users[size] = user_id
+        lessons[size] = lesson_id
+        size += 1
+        if size == chunk_size:
+            user_chunks.append(users.copy())
+            lesson_chunks.append(lessons.copy())
+            size = 0
+    user_chunks.append(users[:size].copy())
+    lesson_chunks.append(lessons[:size].copy())
+
+    user_index = np.concatenate(user_chunks)
+    del user_chunks
+    lesson_index = np.concatenate(lesson_chunks)
+    del lesson_chunks
+    matrix = sparse.csr_matrix(
+        (np.ones(len(user_index), dtype=np.float32), (user_index, lesson_index)), shape=shape,
+    )
+    # Duplicate (user, lesson) pairs were summed while building; clamp them back to the weight.
+    matrix.data[:] = weight
+    return matrix
+
+
+def _max_id(model, field):
+    return model.objects.aggregate(value=Max(field))['value'] or 0
+
+
+def build_interaction_matrix(chunk_size):
+    """Return the weighted users x lessons matrix, indexed directly by primary keys."""
+    sources = (View, LikeLesson, DislikeLesson)
+    shape = (
+        max(_max_id(model, 'user_id') for model in sources) + 1,
+        max(_max_id(model, 'lesson_id') for model in sources) + 1,
+    )
+
+    matrix = _interaction_matrix(View.objects.all(), shape, VIEW_WEIGHT, chunk_size)
+    matrix = matrix.maximum(_interaction_matrix(LikeLesson.objects.all(), shape, LIKE_WEIGHT, chunk_size))
+
+    # A dislike cancels any positive signal the user gave the lesson.
+    disliked = _interaction_matrix(DislikeLesson.objects.all(), shape, 1.0, chunk_size)
+    matrix = matrix - matrix.multiply(disliked)
+    matrix = matrix.tocsr()
+    matrix.eliminate_zeros()
+    return matrix
+
+
+def iter_top_neighbors(matrix, top_k, block_size):
+    """Yield ``(lesson_id, neighbor_id, score)`` for the ``top_k`` cosine neighbors of every lesson.
+
+    The lessons x lessons similarity matrix is never materialized: it is
+    computed ``block_size`` lessons at a time and reduced to top-K right away.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0))).ravel()
+    inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    normalized = (matrix @ sparse.diags(inverse.astype(np.float32))).tocsc()
+    transposed = normalized.T.tocsr()
+
+    active = np.flatnonzero(norms)
+    for start in range(0, len(active), block_size):
+        block = active[start:start + block_size]
+        similarities = (transposed[block] @ normalized).tocsr()
+        for row, lesson_id in enumerate(block):
+            begin, end = similarities.indptr[row], similarities.indptr[row + 1]
+            neighbors = similarities.indices[begin:end]
+            scores = similarities.data[begin:end]
+            keep = neighbors != lesson_id
+            neighbors, scores = neighbors[keep], scores[keep]
+            if len(scores) > top_k:
+                best = np.argpartition(-scores, top_k - 1)[:top_k]
+                neighbors, scores = neighbors[best], scores[best]
+            for neighbor_id, score in zip(neighbors.tolist(), scores.tolist()):
+                yield int(lesson_id), neighbor_id, score
+
+
+def rebuild_lesson_similarities(top_k=None, chunk_size=None, block_size=None, batch_size=5000):
+    """Recompute the precomputed neighbor table from all view/like/dislike rows.
+
+    The table is swapped inside a single transaction, so readers see either
+    the previous build or the new one. Returns the number of rows written.
+    """
+    top_k = top_k or settings.RECOMMENDATIONS_TOP_K
+    chunk_size = chunk_size or settings.RECOMMENDATIONS_CHUNK_SIZE
+    block_size = block_size or settings.RECOMMENDATIONS_BLOCK_SIZE
+
+    matrix = build_interaction_matrix(chunk_size)
+
+    written = 0
+    batch = []
+    with transaction.atomic():
+        LessonSimilarity.objects.all().delete()
+        for lesson_id, neighbor_id, score in iter_top_neighbors(matrix, top_k, block_size):
+            batch.append(LessonSimilarity(lesson_id=lesson_id, neighbor_id=neighbor_id, score=score))
+            if len(batch) >= batch_size:
+                LessonSimilarity.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            LessonSimilarity.objects.bulk_create(batch)
+            written += len(batch)
+    return written
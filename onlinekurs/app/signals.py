@@ -0,0 +1,73 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .live import publish_lesson_change
+from .models import UserProfile, Lesson, Video, LikeLesson, DislikeLesson, Comment, View, NotificationEvent
+from .moderation import enqueue_file_deletions
+from .notifications import record_event
+
+
+# Replaced and deleted files of these fields go through the PendingFileDeletion queue (see purge_media).
+QUEUED_FILE_FIELDS = {
+    Video: 'video',
+    UserProfile: 'image',
+}
+
+
+def remember_file(sender, instance, **kwargs):
+    field_name = QUEUED_FILE_FIELDS[sender]
+    if field_name not in instance.get_deferred_fields():
+        instance._loaded_file_name = getattr(instance, field_name).name
+
+
+def queue_replaced_file(sender, instance, created, **kwargs):
+    new_name = getattr(instance, QUEUED_FILE_FIELDS[sender]).name
+    old_name = getattr(instance, '_loaded_file_name', None)
+    instance._loaded_file_name = new_name
+    if created or not old_name or old_name == new_name:
+        return
+    # Only once the new name is committed; a rolled back save still references the old file.
+    transaction.on_commit(lambda: enqueue_file_deletions([old_name]))
+
+
+def queue_deleted_file(sender, instance, **kwargs):
+    enqueue_file_deletions([getattr(instance, QUEUED_FILE_FIELDS[sender]).name])
+
+
+for model in QUEUED_FILE_FIELDS:
+    post_init.connect(remember_file, sender=model)
+    post_save.connect(queue_replaced_file, sender=model)
+    post_delete.connect(queue_deleted_file, sender=model)
+
+
+@receiver(post_save, sender=Lesson)
+def notify_new_lesson(sender, instance, created, **kwargs):
+    if created and instance.user_id:
+        record_event(NotificationEvent.NEW_LESSON, instance.user, instance)
+
+
+@receiver(post_save, sender=Video)
+def notify_new_video(sender, instance, created, **kwargs):
+    if created and instance.lesson_id and instance.user_id:
+        record_event(NotificationEvent.NEW_VIDEO, instance.user, instance.lesson)
+
+
+@receiver(post_save, sender=Comment)
+def notify_comment_reply(sender, instance, created, **kwargs):
+    if not created or instance.parent_id is None:
+        return
+    recipient = instance.parent.user
+    if recipient.pk != instance.user_id:
+        record_event(NotificationEvent.COMMENT_REPLY, instance.user, instance.lesson,
+                     recipient=recipient, comment=instance)
+
+
+@receiver(post_save, sender=LikeLesson)
+@receiver(post_save, sender=DislikeLesson)
+@receiver(post_save, sender=View)
+@receiver(post_save, sender=Comment)
+def publish_engagement_change(sender, instance, **kwargs):
+    # Deletes publish explicitly (see ``moderation`` and the like toggles): a
+    # post_delete receiver here would stop Django from fast-deleting these tables.
+    publish_lesson_change(instance.lesson_id)
@@ -1,3 +1,546 @@
-from django.test import TestCase
+import asyncio
+import math
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db.models import Sum
+from django.db.models.signals import post_init
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.views.generic import RedirectView
+from rest_framework.views import APIView
+
+from onlinekurs.lazy import LazyView
+
+from .analytics import rollup_lesson_stats, rebuild_lesson_stats
+from .live import lesson_counters_stream, LocalBroker, LessonCounterHub, lesson_channel, lesson_counts
+from .models import (UserProfile, Lesson, Video, View, LikeLesson, DislikeLesson, Comment, LessonSimilarity, LessonStatHourly,
+                     LessonStatDaily, PendingFileDeletion, Follow, NotificationEvent)
+from .moderation import delete_lessons, delete_comments, set_deleted, purge_orphans, purge_pending_files
+from .notifications import inbox_for, unread_count, mark_read
+from . import recommendations
+from .management.commands.bench_importtime import parse_importtime
+from .recommendations import rebuild_lesson_similarities
+
+
+class LessonSimilarityBuildTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create(username=f'user{i}') for i in range(3)]
+        self.a, self.b, self.c = (Lesson.objects.create(title=title) for title in 'ABC')
+
+    def neighbors(self):
+        return {
+            (row.lesson_id, row.neighbor_id): row.score
+            for row in LessonSimilarity.objects.all()
+        }
+
+    def test_stores_cosine_neighbors_and_drops_disliked_pairs(self):
+        first, second, third = self.users
+        View.objects.create(user=first, lesson=self.a)
+        View.objects.create(user=first, lesson=self.b)
+        View.objects.create(user=first, lesson=self.b)  # repeated views count once
+        View.objects.create(user=second, lesson=self.a)
+        View.objects.create(user=second, lesson=self.b)
+        LikeLesson.objects.create(user=second, lesson=self.b)
+        View.objects.create(user=third, lesson=self.a)
+        View.objects.create(user=third, lesson=self.c)
+        DislikeLesson.objects.create(user=third, lesson=self.c)
+
+        # A chunk size of 2 makes the build stream several chunks per source.
+        written = rebuild_lesson_similarities(top_k=5, chunk_size=2, block_size=1)
+
+        # Columns: A = (1, 1, 1), B = (1, 2, 0); C's only signal was cancelled by the dislike.
+        expected = 3 / math.sqrt(3 * 5)
+        neighbors = self.neighbors()
+        self.assertEqual(written, 2)
+        self.assertEqual(set(neighbors), {(self.a.pk, self.b.pk), (self.b.pk, self.a.pk)})
+        for score in neighbors.values():
+            self.assertAlmostEqual(score, expected, places=5)
+
+    def test_rebuild_replaces_previous_table(self):
+        LessonSimilarity.objects.create(lesson=self.a, neighbor=self.c, score=1.0)
+        View.objects.create(user=self.users[0], lesson=self.a)
+        View.objects.create(user=self.users[0], lesson=self.b)
+
+        rebuild_lesson_similarities(top_k=5)
+
+        self.assertEqual(set(self.neighbors()), {(self.a.pk, self.b.pk), (self.b.pk, self.a.pk)})
+
+    def test_top_k_limits_neighbors_per_lesson(self):
+        for user in self.users:
+            for lesson in (self.a, self.b, self.c):
+                View.objects.create(user=user, lesson=lesson)
+
+        rebuild_lesson_similarities(top_k=1)
+
+        self.assertEqual(LessonSimilarity.objects.filter(lesson=self.a).count(), 1)
+        self.assertEqual(LessonSimilarity.objects.count(), 3)
+
+    def test_rows_written_after_the_shape_is_taken_are_skipped(self):
+        View.objects.create(user=self.users[0], lesson=self.a)
+        View.objects.create(user=self.users[0], lesson=self.b)
+        stream = recommendations._interaction_matrix
+
+        def insert_then_stream(queryset, shape, weight, chunk_size):
+            if not User.objects.filter(username='late').exists():
+                late = User.objects.create(username='late')
+                View.objects.create(user=late, lesson=Lesson.objects.create(title='Late'))
+            return stream(queryset, shape, weight, chunk_size)
+
+        with mock.patch('app.recommendations._interaction_matrix', insert_then_stream):
+            rebuild_lesson_similarities(top_k=5)
+
+        self.assertEqual(set(self.neighbors()), {(self.a.pk, self.b.pk), (self.b.pk, self.a.pk)})
+
+
+class LessonStatRollupTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(username='author')
+        self.lesson = Lesson.objects.create(title='Rollup', user=self.author)
+        self.viewers = [User.objects.create(username=f'viewer{i}') for i in range(6)]
+
+    def add_views(self, users, age):
+        views = View.objects.bulk_create([View(user=user, lesson=self.lesson) for user in users])
+        View.objects.filter(pk__in=[view.pk for view in views]).update(viewed_at=timezone.now() - age)
+
+    def totals(self):
+        return LessonStatDaily.objects.filter(lesson=self.lesson).aggregate(
+            views=Sum('views'), likes=Sum('likes'), comments=Sum('comments'),
+        )
+
+    def test_second_run_is_a_no_op(self):
+        self.add_views(self.viewers, timedelta(hours=2))
+
+        first = rollup_lesson_stats(batch_size=4, lag=timedelta(0))
+        second = rollup_lesson_stats(batch_size=4, lag=timedelta(0))
+
+        self.assertEqual(first['views'], 6)
+        self.assertEqual(second, {'views': 0, 'likes': 0, 'dislikes': 0, 'comments': 0})
+        self.assertEqual(self.totals()['views'], 6)
+        self.assertEqual(LessonStatHourly.objects.get(lesson=self.lesson).views, 6)
+
+    def test_rows_newer_than_lag_are_held_back(self):
+        self.add_views(self.viewers[:2], timedelta(hours=1))
+        self.add_views(self.viewers[2:], timedelta(seconds=5))
+
+        processed = rollup_lesson_stats(lag=timedelta(minutes=1))
+        self.assertEqual(processed['views'], 2)
+        self.assertEqual(self.totals()['views'], 2)
+
+        View.objects.update(viewed_at=timezone.now() - timedelta(minutes=30))
+        processed = rollup_lesson_stats(lag=timedelta(minutes=1))
+        self.assertEqual(processed['views'], 4)
+        self.assertEqual(self.totals()['views'], 6)
+
+    def test_rebuild_then_incremental_run_matches_raw_counts(self):
+        self.add_views(self.viewers[:3], timedelta(hours=1))
+        LikeLesson.objects.create(user=self.viewers[0], lesson=self.lesson)
+        rollup_lesson_stats(lag=timedelta(0))
+
+        # Rows added after the last run must be counted once: by the next run, not by the rebuild.
+        self.add_views(self.viewers[3:], timedelta(minutes=30))
+        Comment.objects.create(user=self.viewers[1], lesson=self.lesson, content='hi')
+        today = timezone.localdate()
+        rebuild_lesson_stats(today - timedelta(days=1), today)
+        self.assertEqual(self.totals(), {'views': 3, 'likes': 1, 'comments': 0})
+
+        rollup_lesson_stats(lag=timedelta(0))
+        self.assertEqual(self.totals(), {
+            'views': View.objects.filter(lesson=self.lesson).count(),
+            'likes': LikeLesson.objects.filter(lesson=self.lesson).count(),
+            'comments': Comment.objects.filter(lesson=self.lesson).count(),
+        })
+
+
+class ModerationTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create(username='moderator')
+        self.lesson = Lesson.objects.create(title='Moderated', user=self.user)
+
+    def add_video(self, lesson):
+        video = Video(lesson=lesson, user=self.user, title='clip')
+        video.video.save('clip.mp4', ContentFile(b'data'), save=True)
+        return video
+
+    def test_delete_lessons_leaves_no_orphans_and_queues_files(self):
+        video = self.add_video(self.lesson)
+        LikeLesson.objects.create(lesson=self.lesson, user=self.user)
+        DislikeLesson.objects.create(lesson=self.lesson, user=self.user)
+        View.objects.create(lesson=self.lesson, user=self.user)
+        Comment.objects.create(lesson=self.lesson, user=self.user, content='bye')
+
+        self.assertEqual(delete_lessons([self.lesson.pk]), 1)
+
+        self.assertFalse(Lesson.objects.exists())
+        for model in (Video, LikeLesson, DislikeLesson, View, Comment):
+            self.assertFalse(model.objects.exists(), model.__name__)
+        # The file is queued for purge_media, not removed inline.
+        self.assertTrue(default_storage.exists(video.video.name))
+        self.assertEqual(list(PendingFileDeletion.objects.values_list('name', flat=True)), [video.video.name])
+
+    def test_purge_orphans_removes_lessonless_rows_only(self):
+        kept = self.add_video(self.lesson)
+        orphan = self.add_video(None)
+        LikeLesson.objects.create(lesson=None, user=self.user)
+        LikeLesson.objects.create(lesson=self.lesson, user=User.objects.create(username='fan'))
+        DislikeLesson.objects.create(lesson=None, user=self.user)
+
+        purged = purge_orphans(batch_size=1)
+
+        self.assertEqual(purged, {'Video': 1, 'LikeLesson': 1, 'DislikeLesson': 1})
+        self.assertEqual(list(Video.objects.all()), [kept])
+        self.assertFalse(LikeLesson.objects.filter(lesson__isnull=True).exists())
+        self.assertEqual(LikeLesson.objects.count(), 1)
+        self.assertEqual(list(PendingFileDeletion.objects.values_list('name', flat=True)), [orphan.video.name])
+
+    def test_purge_pending_files_keeps_failed_deletions_queued(self):
+        for name in ('ok-1.mp4', 'broken.mp4', 'ok-2.mp4'):
+            default_storage.save(name, ContentFile(b'data'))
+            PendingFileDeletion.objects.create(name=name)
+        real_delete = default_storage.delete
+
+        def delete(name):
+            if name == 'broken.mp4':
+                raise OSError('storage unavailable')
+            real_delete(name)
+
+        with mock.patch.object(default_storage, 'delete', side_effect=delete), \
+                self.assertLogs('app.moderation', 'ERROR'):
+            purged = purge_pending_files(batch_size=2)
+
+        self.assertEqual(purged, 2)
+        self.assertEqual(list(PendingFileDeletion.objects.values_list('name', flat=True)), ['broken.mp4'])
+        self.assertFalse(default_storage.exists('ok-1.mp4'))
+        self.assertTrue(default_storage.exists('broken.mp4'))
+
+    def test_deleted_profile_image_is_queued(self):
+        profile = UserProfile(user=self.user)
+        profile.image.save('avatar.png', ContentFile(b'png'), save=True)
+
+        profile.delete()
+
+        self.assertTrue(default_storage.exists(profile.image.name))
+        self.assertEqual(list(PendingFileDeletion.objects.values_list('name', flat=True)), [profile.image.name])
+
+    def test_replaced_video_file_is_queued_after_commit(self):
+        video = self.add_video(self.lesson)
+        old_name = video.video.name
+        video = Video.objects.get(pk=video.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            video.video.save('other.mp4', ContentFile(b'new'), save=True)
+            self.assertFalse(PendingFileDeletion.objects.exists())
+
+        self.assertEqual(list(PendingFileDeletion.objects.values_list('name', flat=True)), [old_name])
+
+
+    def test_raw_deleted_models_have_no_unhandled_reverse_relations(self):
+        # _delete_videos and _delete_comments bypass the collector, so every model
+        # pointing at Video or Comment must be cleaned up there by hand. Handle a
+        # new relation in moderation.py before adding it here.
+        handled = {
+            Video: set(),
+            Comment: {(Comment, 'parent'), (NotificationEvent, 'comment')},
+        }
+        for model, expected in handled.items():
+            relations = {(rel.related_model, rel.field.name) for rel in model._meta.related_objects}
+            self.assertEqual(relations, expected, f'{model.__name__} gained a reverse relation')
+
+
+class CommentDeletionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='commenter')
+        self.other = User.objects.create(username='replier')
+
+    def add_thread(self, lesson, replies):
+        comment = Comment.objects.create(lesson=lesson, user=self.user, content='question')
+        for _ in range(replies):
+            Comment.objects.create(lesson=lesson, user=self.other, content='answer', parent=comment)
+        return comment
+
+    def test_delete_lessons_does_not_load_comments(self):
+        lesson = Lesson.objects.create(title='Thread', user=self.user)
+        self.add_thread(lesson, replies=20)
+        loaded = []
+        post_init.connect(lambda sender, instance, **kwargs: loaded.append(instance), sender=Comment, weak=False,
+                          dispatch_uid='count-loaded-comments')
+        self.addCleanup(post_init.disconnect, sender=Comment, dispatch_uid='count-loaded-comments')
+
+        delete_lessons([lesson.pk])
+
+        self.assertEqual(loaded, [])
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(NotificationEvent.objects.exists())
+
+    def test_delete_comments_detaches_replies_and_drops_their_events(self):
+        lesson = Lesson.objects.create(title='Thread', user=self.user)
+        comment = self.add_thread(lesson, replies=2)
+        self.assertEqual(NotificationEvent.objects.filter(kind=NotificationEvent.COMMENT_REPLY).count(), 2)
+
+        reply = comment.replies.first()
+        self.assertEqual(delete_comments([comment.pk, reply.pk]), 2)
+
+        remaining = Comment.objects.get()
+        self.assertIsNone(remaining.parent_id)
+        self.assertEqual(NotificationEvent.objects.filter(kind=NotificationEvent.COMMENT_REPLY).count(), 1)
+
+    def test_bulk_deletes_publish_once_per_lesson(self):
+        first = Lesson.objects.create(title='First', user=self.user)
+        second = Lesson.objects.create(title='Second', user=self.user)
+        ids = [self.add_thread(first, replies=3).pk, self.add_thread(second, replies=0).pk]
+        ids += list(first.comments.exclude(pk__in=ids).values_list('pk', flat=True))
+
+        with mock.patch('app.live.get_broker') as get_broker:
+            with self.captureOnCommitCallbacks(execute=True):
+                set_deleted(Comment, ids)
+            with self.captureOnCommitCallbacks(execute=True):
+                delete_comments(ids)
+
+        published = sorted(call.args[0] for call in get_broker.return_value.publish.call_args_list)
+        self.assertEqual(published, sorted([lesson_channel(first.pk), lesson_channel(second.pk)] * 2))
+
+
+class NotificationInboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.author = User.objects.create(username='author')
+        self.reader = User.objects.create(username='reader')
+        Follow.objects.create(follower=self.reader, author=self.author)
+
+    def test_inbox_merges_follows_likes_and_replies(self):
+        lesson = Lesson.objects.create(title='Followed', user=self.author)
+        stranger = User.objects.create(username='stranger')
+        liked = Lesson.objects.create(title='Liked', user=stranger)
+        Lesson.objects.create(title='Unrelated', user=stranger)
+        LikeLesson.objects.create(lesson=liked, user=self.reader)
+        Video.objects.create(lesson=liked, user=stranger, title='New part')
+        comment = Comment.objects.create(lesson=lesson, user=self.reader, content='question')
+        Comment.objects.create(lesson=lesson, user=self.author, content='answer', parent=comment)
+
+        kinds = list(inbox_for(self.reader).order_by('pk').values_list('kind', flat=True))
+
+        self.assertEqual(kinds, [NotificationEvent.NEW_LESSON, NotificationEvent.NEW_VIDEO,
+                                 NotificationEvent.COMMENT_REPLY])
+
+    def test_own_events_are_excluded(self):
+        lesson = Lesson.objects.create(title='Mine', user=self.reader)
+        LikeLesson.objects.create(lesson=lesson, user=self.reader)
+        Video.objects.create(lesson=lesson, user=self.reader, title='My video')
+        Follow.objects.create(follower=self.reader, author=self.reader)
+
+        self.assertFalse(inbox_for(self.reader).exists())
+
+    def test_mark_read_moves_the_cursor_forward_only(self):
+        first = Lesson.objects.create(title='One', user=self.author)
+        Lesson.objects.create(title='Two', user=self.author)
+        self.assertEqual(unread_count(self.reader), 2)
+
+        newest = mark_read(self.reader)
+        self.assertEqual(unread_count(self.reader), 0)
+        self.assertEqual(mark_read(self.reader, first.notification_events.get().pk), newest)
+
+        Lesson.objects.create(title='Three', user=self.author)
+        cache.clear()
+        self.assertEqual(unread_count(self.reader), 1)
+
+    def test_mark_read_is_capped_at_the_newest_event(self):
+        lesson = Lesson.objects.create(title='One', user=self.author)
+        newest = lesson.notification_events.get().pk
+
+        self.assertEqual(mark_read(self.reader, newest + 10 ** 12), newest)
+
+        Lesson.objects.create(title='Two', user=self.author)
+        self.assertEqual(unread_count(self.reader), 1)
+
+    def test_only_events_after_the_follow_or_like_are_shown(self):
+        stranger = User.objects.create(username='stranger')
+        old_lesson = Lesson.objects.create(title='Back catalogue', user=stranger)
+        Video.objects.create(lesson=old_lesson, user=stranger, title='Old part')
+        NotificationEvent.objects.update(created=timezone.now() - timedelta(hours=1))
+
+        Follow.objects.create(follower=self.reader, author=stranger)
+        LikeLesson.objects.create(lesson=old_lesson, user=self.reader)
+        self.assertFalse(inbox_for(self.reader).exists())
+
+        Lesson.objects.create(title='Fresh', user=stranger)
+        Video.objects.create(lesson=old_lesson, user=stranger, title='New part')
+        kinds = list(inbox_for(self.reader).order_by('pk').values_list('kind', flat=True))
+        self.assertEqual(kinds, [NotificationEvent.NEW_LESSON, NotificationEvent.NEW_VIDEO])
+
+    def test_reply_invalidates_cached_unread_count(self):
+        lesson = Lesson.objects.create(title='One', user=self.author)
+        self.assertEqual(unread_count(self.reader), 1)
+
+        # Fanned-out events wait for the cache entry to expire ...
+        Lesson.objects.create(title='Two', user=self.author)
+        self.assertEqual(unread_count(self.reader), 1)
+
+        # ... while a direct reply clears it right away.
+        comment = Comment.objects.create(lesson=lesson, user=self.reader, content='question')
+        Comment.objects.create(lesson=lesson, user=self.author, content='answer', parent=comment)
+        self.assertEqual(unread_count(self.reader), 3)
+
+
+class LazyViewTests(SimpleTestCase):
+    def test_import_is_deferred_until_first_use(self):
+        view = LazyView('app.no_such_module.View')
+        self.assertEqual(repr(view), '<LazyView app.no_such_module.View>')
+        with self.assertRaises(ImportError):
+            view.view_class
+
+    def test_class_based_view_is_built_with_initkwargs(self):
+        view = LazyView('django.views.generic.RedirectView', url='/target/')
+
+        response = view(RequestFactory().get('/'))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, '/target/')
+        self.assertIs(view.view_class, RedirectView)
+        self.assertEqual(view.view_initkwargs, {'url': '/target/'})
+
+    def test_csrf_exempt_is_forwarded(self):
+        self.assertTrue(LazyView('rest_framework.views.APIView').csrf_exempt)
+        self.assertIs(LazyView('rest_framework.views.APIView').cls, APIView)
+        self.assertFalse(getattr(LazyView('django.views.generic.RedirectView'), 'csrf_exempt', False))
+
+    def test_plain_function_is_used_as_is(self):
+        self.assertIs(LazyView('app.live.lesson_counters_stream').view, lesson_counters_stream)
+
+
+class ParseImportTimeTests(SimpleTestCase):
+    def test_sums_self_time_and_keeps_cumulative_per_module(self):
+        stderr = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |   _io\n'
+            'import time:        50 |        300 | encodings\n'
+            'some warning printed by a module\n'
+            'import time:       900 |       1200 |     django.db.models\n'
+        )
+
+        total, modules = parse_importtime(stderr)
+
+        self.assertEqual(total, 1070)
+        self.assertEqual(modules, {'_io': 120, 'encodings': 300, 'django.db.models': 1200})
+
+    def test_empty_output(self):
+        self.assertEqual(parse_importtime(''), (0, {}))
+
+
+class LessonCounterHubTests(TransactionTestCase):
+    interval = 0.2
+
+    def setUp(self):
+        self.user = User.objects.create(username='watcher')
+        self.lesson = Lesson.objects.create(title='Live', user=self.user)
+        self.broker = LocalBroker()
+        self.hub = LessonCounterHub(self.broker, self.interval)
+        self.reads = []
+
+    def counting_reads(self):
+        def read(lesson_id):
+            self.reads.append(time.monotonic())
+            return lesson_counts(lesson_id)
+        return mock.patch('app.live.lesson_counts', read)
+
+    async def change(self, model, bursts=1):
+        await sync_to_async(model.objects.create)(lesson=self.lesson, user=self.user)
+        for _ in range(bursts):
+            self.broker.publish(lesson_channel(self.lesson.pk), 'changed')
+
+    async def close(self, streams):
+        for stream in streams:
+            await stream.aclose()
+        # Let the cancelled broker subscription unwind before the loop stops.
+        await asyncio.sleep(0)
+
+    async def test_watchers_share_one_read_per_interval(self):
+        with self.counting_reads():
+            streams = [self.hub.watch(self.lesson.pk, heartbeat=5) for _ in range(25)]
+            try:
+                initial = [await anext(stream) for stream in streams]
+                self.assertEqual(len(self.reads), 1)
+                zero = {'likes': 0, 'dislikes': 0, 'views': 0, 'comments': 0}
+                self.assertEqual(initial, [{'counts': zero, 'delta': {}}] * 25)
+
+                await self.change(LikeLesson, bursts=10)
+                events = [await anext(stream) for stream in streams]
+                self.assertEqual(len(self.reads), 2)
+                self.assertEqual(events, [{'counts': {**zero, 'likes': 1}, 'delta': {'likes': 1}}] * 25)
+
+                await self.change(View, bursts=10)
+                events = [await anext(stream) for stream in streams]
+                self.assertEqual(len(self.reads), 3)
+                self.assertEqual(events[0]['delta'], {'views': 1})
+            finally:
+                await self.close(streams)
+
+        gaps = [later - earlier for earlier, later in zip(self.reads, self.reads[1:])]
+        self.assertTrue(all(gap >= self.interval * 0.95 for gap in gaps), gaps)
+
+    async def test_slow_watcher_gets_merged_delta(self):
+        with self.counting_reads():
+            fast = self.hub.watch(self.lesson.pk, heartbeat=5)
+            slow = self.hub.watch(self.lesson.pk, heartbeat=5)
+            try:
+                await anext(fast)
+                await anext(slow)
+
+                await self.change(LikeLesson)
+                self.assertEqual((await anext(fast))['delta'], {'likes': 1})
+                await self.change(View)
+                self.assertEqual((await anext(fast))['delta'], {'views': 1})
+
+                event = await anext(slow)
+                self.assertEqual(event['counts'], {'likes': 1, 'dislikes': 0, 'views': 1, 'comments': 0})
+                self.assertEqual(event['delta'], {'likes': 1, 'views': 1})
+                self.assertEqual(len(self.reads), 3)
+            finally:
+                await self.close([fast, slow])
+
+    async def test_heartbeat_when_idle_and_feed_closed_after_last_watcher(self):
+        stream = self.hub.watch(self.lesson.pk, heartbeat=0.05)
+        try:
+            await anext(stream)
+            self.assertIsNone(await anext(stream))
+        finally:
+            await self.close([stream])
+        self.assertEqual(self.hub._feeds, {})
+
+    async def test_closing_the_last_watcher_cancels_a_scheduled_read(self):
+        with self.counting_reads():
+            stream = self.hub.watch(self.lesson.pk, heartbeat=5)
+            await anext(stream)
+            await self.change(LikeLesson)
+            # Give the listener time to schedule the read, then leave before it is due.
+            await asyncio.sleep(self.interval / 4)
+            await self.close([stream])
+            await asyncio.sleep(self.interval * 1.5)
+        self.assertEqual(len(self.reads), 1)
+
+    async def test_stream_ends_when_the_lesson_is_deleted(self):
+        stream = self.hub.watch(self.lesson.pk, heartbeat=5)
+        try:
+            await anext(stream)
+            await sync_to_async(delete_lessons)([self.lesson.pk])
+            self.broker.publish(lesson_channel(self.lesson.pk), 'changed')
+            with self.assertRaises(StopAsyncIteration):
+                await asyncio.wait_for(anext(stream), self.interval * 5)
+        finally:
+            await self.close([stream])
+        self.assertEqual(self.hub._feeds, {})
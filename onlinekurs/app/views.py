@@ -13,6 +13,8 @@ from .models import UserProfile, Lesson, Video, LikeLesson, DislikeLesson, Comme
 from .serializers import (UserProfileSerializer, LessonSerializer,VerifyEmailSerializer, VideoSerializer,
                           LikeLessonSerializer, DislikeLessonSerializer, CommentSerializer, ViewSerializer)
 from .utils import send_verification_email, send_mail_to_email
+from .live import publish_lesson_change
+from .moderation import delete_lessons, delete_comments
 
 
 class UserRegistrationAPIView(generics.CreateAPIView):
@@ -130,7 +132,7 @@ class UserProfileViewSet(viewsets.ModelViewSet):
 
 
 class LessonViewSet(viewsets.ModelViewSet):
-    queryset = Lesson.objects.all()
+    queryset = Lesson.objects.filter(is_deleted=False)
     serializer_class = LessonSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -159,6 +161,9 @@ class LessonViewSet(viewsets.ModelViewSet):
         else:
             return Response({'message': 'You are not allowed to delete this lesson'}, status=status.HTTP_403_FORBIDDEN)
 
+    def perform_destroy(self, instance):
+        delete_lessons([instance.pk])
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         likes = LikeLesson.objects.filter(lesson=instance)
@@ -167,7 +172,7 @@ class LessonViewSet(viewsets.ModelViewSet):
         if not existing_view:
             View.objects.create(lesson=instance, user=request.user)
         views = View.objects.filter(lesson=instance)
-        videos = Video.objects.filter(lesson=instance)
+        videos = Video.objects.filter(lesson=instance, is_deleted=False)
         video_serializer = VideoSerializer(videos, many=True)
         data = {
             'lesson': LessonSerializer(instance).data,
@@ -180,12 +185,12 @@ class LessonViewSet(viewsets.ModelViewSet):
 
 
 class VideoViewSet(viewsets.ModelViewSet):
-    queryset = Video.objects.all()
+    queryset = Video.objects.filter(is_deleted=False, lesson__is_deleted=False)
     serializer_class = VideoSerializer
 
     def create(self, request, *args, **kwargs):
         lesson_id = request.data.get('lesson')
-        lesson = Lesson.objects.get(pk=lesson_id)
+        lesson = Lesson.objects.get(pk=lesson_id, is_deleted=False)
         if request.user.is_superuser or lesson.user == request.user:
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
@@ -232,10 +237,12 @@ class LikeLessonViewSet(viewsets.ModelViewSet):
         existing_dislike = DislikeLesson.objects.filter(lesson=lesson_id, user=request.user).first()
         if existing_dislike:
             existing_dislike.delete()
+            publish_lesson_change(existing_dislike.lesson_id)
 
         existing_like = LikeLesson.objects.filter(lesson=lesson_id, user=request.user).first()
         if existing_like:
             existing_like.delete()
+            publish_lesson_change(existing_like.lesson_id)
             return Response({'message': 'Like removed successfully'}, status=status.HTTP_204_NO_CONTENT)
 
         serializer = self.get_serializer(data=request.data)
@@ -243,6 +250,10 @@ class LikeLessonViewSet(viewsets.ModelViewSet):
         serializer.save(user=request.user)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    def perform_destroy(self, instance):
+        instance.delete()
+        publish_lesson_change(instance.lesson_id)
+
 
 class DislikeLessonViewSet(viewsets.ModelViewSet):
     queryset = DislikeLesson.objects.all()
@@ -253,10 +264,12 @@ class DislikeLessonViewSet(viewsets.ModelViewSet):
         existing_like = LikeLesson.objects.filter(lesson=lesson_id, user=request.user).first()
         if existing_like:
             existing_like.delete()
+            publish_lesson_change(existing_like.lesson_id)
 
         existing_dislike = DislikeLesson.objects.filter(lesson=lesson_id, user=request.user).first()
         if existing_dislike:
             existing_dislike.delete()
+            publish_lesson_change(existing_dislike.lesson_id)
             return Response({'message': 'Dislike removed successfully'}, status=status.HTTP_204_NO_CONTENT)
 
         serializer = self.get_serializer(data=request.data)
@@ -264,9 +277,13 @@ class DislikeLessonViewSet(viewsets.ModelViewSet):
         serializer.save(user=request.user)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    def perform_destroy(self, instance):
+        instance.delete()
+        publish_lesson_change(instance.lesson_id)
+
 
 class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.all()
+    queryset = Comment.objects.filter(is_deleted=False, lesson__is_deleted=False)
     serializer_class = CommentSerializer
 
     def update(self, request, *args, **kwargs):
@@ -287,6 +304,9 @@ class CommentViewSet(viewsets.ModelViewSet):
         else:
             return Response({'message': 'You are not allowed to delete this comment'}, status=status.HTTP_403_FORBIDDEN)
 
+    def perform_destroy(self, instance):
+        delete_comments([instance.pk])
+
 
 class LessonSearchAPIView(generics.ListAPIView):
     serializer_class = LessonSerializer
@@ -296,7 +316,8 @@ class LessonSearchAPIView(generics.ListAPIView):
         query = self.request.query_params.get('q', '')
         return Lesson.objects.filter(
             Q(title__icontains=query) |
-            Q(video__title__icontains=query)
+            Q(video__title__icontains=query, video__is_deleted=False),
+            is_deleted=False,
         ).distinct()
 
     def list(self, request, *args, **kwargs):
@@ -310,7 +331,7 @@ class MostLikedLessonsAPIView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Lesson.objects.annotate(like_count=Count('likelesson')).order_by('-like_count')
+        return Lesson.objects.filter(is_deleted=False).annotate(like_count=Count('likelesson')).order_by('-like_count')
 
 
 class MostViewedLessonsAPIView(generics.ListAPIView):
@@ -318,7 +339,7 @@ class MostViewedLessonsAPIView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Lesson.objects.annotate(view_count=Count('views')).order_by('-view_count')
+        return Lesson.objects.filter(is_deleted=False).annotate(view_count=Count('views')).order_by('-view_count')
 
 
 class NotifyAllUsersAPIView(APIView):
@@ -341,4 +362,3 @@ class NotifyAllUsersAPIView(APIView):
         send_mail_to_email(emails, subject, message)
 
         return Response({'detail': 'Notification sent to all users.'}, status=status.HTTP_200_OK)
-
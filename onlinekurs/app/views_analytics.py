@@ -0,0 +1,94 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import Lesson, LessonStatHourly, LessonStatDaily
+
+
+STAT_FIELDS = ('views', 'likes', 'dislikes', 'comments')
+
+
+def parse_date_range(query_params, default_days=30):
+    """Read ``start``/``end`` (YYYY-MM-DD, inclusive) from the query string; raises ValueError."""
+    dates = {}
+    for name in ('start', 'end'):
+        value = query_params.get(name)
+        dates[name] = parse_date(value) if value else None
+        if value and dates[name] is None:
+            raise ValueError(f'{name} must be given as YYYY-MM-DD.')
+    end = dates['end'] or timezone.localdate()
+    start = dates['start'] or end - timedelta(days=default_days - 1)
+    if end < start:
+        raise ValueError('end must not be before start.')
+    return start, end
+
+
+class AuthorLessonStatsAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            start, end = parse_date_range(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        stats = (
+            LessonStatDaily.objects.filter(lesson__user=request.user, bucket__gte=start, bucket__lte=end)
+            .values('lesson_id', 'lesson__title')
+            .annotate(**{field: Sum(field) for field in STAT_FIELDS})
+            .order_by('-views')
+        )
+        data = {
+            'start': start,
+            'end': end,
+            'lessons': [
+                {'lesson': row['lesson_id'], 'title': row['lesson__title'],
+                 **{field: row[field] for field in STAT_FIELDS}}
+                for row in stats
+            ],
+        }
+        return Response(data)
+
+
+class AuthorLessonStatsSeriesAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        try:
+            lesson = Lesson.objects.get(pk=pk)
+        except Lesson.DoesNotExist:
+            return Response({'error': 'Lesson not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if not (request.user.is_superuser or lesson.user == request.user):
+            return Response({'message': 'You are not allowed to view stats of this lesson'},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        granularity = request.query_params.get('granularity', 'day')
+        try:
+            start, end = parse_date_range(request.query_params, default_days=7 if granularity == 'hour' else 30)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if granularity == 'day':
+            stats = LessonStatDaily.objects.filter(lesson=lesson, bucket__gte=start, bucket__lte=end)
+        elif granularity == 'hour':
+            tz = timezone.get_current_timezone()
+            stats = LessonStatHourly.objects.filter(
+                lesson=lesson,
+                bucket__gte=datetime.combine(start, time.min, tzinfo=tz),
+                bucket__lt=datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz),
+            )
+        else:
+            return Response({'error': 'granularity must be "hour" or "day".'}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {
+            'lesson': lesson.pk,
+            'granularity': granularity,
+            'series': list(stats.order_by('bucket').values('bucket', *STAT_FIELDS)),
+        }
+        return Response(data)
@@ -0,0 +1,44 @@
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import Lesson, Video, Comment
+from .moderation import delete_lessons, delete_videos, delete_comments, set_deleted
+
+
+class BulkModerationAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
+    targets = {
+        'lessons': (Lesson, delete_lessons),
+        'videos': (Video, delete_videos),
+        'comments': (Comment, delete_comments),
+    }
+    actions = ('delete', 'soft_delete', 'restore')
+
+    def get(self, request, *args, **kwargs):
+        json_template = {
+            "ids": [],
+            "action": "soft_delete"
+        }
+        return Response(json_template)
+
+    def post(self, request, target, *args, **kwargs):
+        if target not in self.targets:
+            return Response({'error': f'Unknown target. Choose one of: {", ".join(self.targets)}.'},
+                            status=status.HTTP_404_NOT_FOUND)
+        action = request.data.get('action')
+        ids = request.data.get('ids')
+        if action not in self.actions:
+            return Response({'error': f'action must be one of: {", ".join(self.actions)}.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(ids, list) or not ids or not all(
+                isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+            return Response({'error': 'ids must be a non-empty list of integers.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        model, delete = self.targets[target]
+        if action == 'delete':
+            affected = delete(ids)
+        else:
+            affected = set_deleted(model, ids, is_deleted=action == 'soft_delete')
+        return Response({'action': action, 'affected': affected}, status=status.HTTP_200_OK)
@@ -0,0 +1,74 @@
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import Follow
+from .notifications import inbox_for, last_read_id, unread_count, mark_read
+
+
+class FollowAuthorAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk, *args, **kwargs):
+        if pk == request.user.pk:
+            return Response({'error': 'You cannot follow yourself.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not User.objects.filter(pk=pk).exists():
+            return Response({'error': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        existing_follow = Follow.objects.filter(follower=request.user, author_id=pk).first()
+        if existing_follow:
+            existing_follow.delete()
+            return Response({'message': 'Unfollowed successfully'}, status=status.HTTP_204_NO_CONTENT)
+
+        Follow.objects.create(follower=request.user, author_id=pk)
+        return Response({'message': 'Followed successfully'}, status=status.HTTP_201_CREATED)
+
+
+class NotificationListAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 20)), 100))
+            before = request.query_params.get('before')
+            before = int(before) if before else None
+        except ValueError:
+            return Response({'error': 'limit and before must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        events = inbox_for(request.user).select_related('actor', 'lesson').order_by('-pk')
+        if before is not None:
+            events = events.filter(pk__lt=before)
+        cursor = last_read_id(request.user)
+        data = [
+            {
+                'id': event.pk,
+                'kind': event.kind,
+                'actor': event.actor.username,
+                'lesson': event.lesson_id,
+                'lesson_title': event.lesson.title,
+                'comment': event.comment_id,
+                'created': event.created,
+                'unread': event.pk > cursor,
+            }
+            for event in events[:limit]
+        ]
+        return Response(data)
+
+
+class NotificationUnreadCountAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        return Response({'unread': unread_count(request.user)})
+
+
+class NotificationReadAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        upto_id = request.data.get('last_id')
+        if upto_id is not None and (not isinstance(upto_id, int) or isinstance(upto_id, bool)):
+            return Response({'error': 'last_id must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'last_read_id': mark_read(request.user, upto_id)})
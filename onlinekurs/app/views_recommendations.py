@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.db.models import Q, Count, Sum
+from rest_framework import status, generics
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .models import Lesson, LikeLesson, DislikeLesson, View
+from .serializers import LessonSerializer
+
+
+class RelatedLessonsAPIView(generics.ListAPIView):
+    serializer_class = LessonSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Lesson.objects.none()
+        top_k = settings.RECOMMENDATIONS_TOP_K
+        return Lesson.objects.filter(
+            neighbor_of__lesson_id=self.kwargs['pk'], is_deleted=False
+        ).order_by('-neighbor_of__score')[:top_k]
+
+    def list(self, request, *args, **kwargs):
+        if not Lesson.objects.filter(pk=self.kwargs['pk'], is_deleted=False).exists():
+            return Response({'error': 'Lesson not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return super().list(request, *args, **kwargs)
+
+
+class RecommendedLessonsAPIView(generics.ListAPIView):
+    serializer_class = LessonSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Lesson.objects.none()
+        user = self.request.user
+        top_k = settings.RECOMMENDATIONS_TOP_K
+        viewed = View.objects.filter(user=user).values('lesson')
+        # SET_NULL leaves lesson=NULL rows behind, which would empty a NOT IN.
+        liked = LikeLesson.objects.filter(user=user, lesson__isnull=False).values('lesson')
+        disliked = DislikeLesson.objects.filter(user=user, lesson__isnull=False).values('lesson')
+        return Lesson.objects.filter(
+            Q(neighbor_of__lesson__in=viewed) | Q(neighbor_of__lesson__in=liked), is_deleted=False
+        ).exclude(
+            Q(pk__in=viewed) | Q(pk__in=liked) | Q(pk__in=disliked)
+        ).annotate(score=Sum('neighbor_of__score')).order_by('-score')[:top_k]
+
+    def list(self, request, *args, **kwargs):
+        lessons = list(self.get_queryset())
+        if not lessons:
+            # Users without any history get the global favourites instead.
+            top_k = settings.RECOMMENDATIONS_TOP_K
+            lessons = Lesson.objects.filter(is_deleted=False).annotate(
+                like_count=Count('likelesson')
+            ).order_by('-like_count')[:top_k]
+        serializer = self.get_serializer(lessons, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,43 @@
+"""Helpers that keep view modules out of the URLconf import.
+
+Routes point at dotted paths; the module behind a route is imported the first
+time a request (or something like a system check or ``reverse()``) needs it.
+"""
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+
+class LazyView:
+    """A URL callback that imports ``dotted_path`` on first use.
+
+    Class-based views are built with ``as_view(**initkwargs)``; plain view
+    functions are used as they are. Attribute lookups such as
+    ``csrf_exempt`` or ``cls`` are forwarded to the real view.
+    """
+
+    def __init__(self, dotted_path, **initkwargs):
+        self.dotted_path = dotted_path
+        self.initkwargs = initkwargs
+
+    @cached_property
+    def view(self):
+        view = import_string(self.dotted_path)
+        if hasattr(view, 'as_view'):
+            view = view.as_view(**self.initkwargs)
+        return view
+
+    def __call__(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
+
+    def __getattr__(self, name):
+        if name in ('dotted_path', 'initkwargs') or name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.view, name)
+
+    def __repr__(self):
+        return f'<LazyView {self.dotted_path}>'
+
+
+def lazy_include(urlconf_module, namespace=None):
+    """Like ``include('dotted.urls')`` but the URLconf is imported on first resolve."""
+    return urlconf_module, None, namespace
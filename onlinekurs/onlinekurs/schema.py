@@ -0,0 +1,53 @@
+"""OpenAPI schema and documentation views.
+
+This module is only imported when one of the docs routes is hit, so drf_yasg
+stays out of worker and management command startup. ``manage.py
+generate_swagger`` picks up ``api_info`` through ``SWAGGER_SETTINGS`` and can
+write the schema to ``OPENAPI_SCHEMA_FILE`` at build time.
+"""
+import functools
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import patch_cache_control
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+api_info = openapi.Info(
+    title="Your API",
+    default_version='v1',
+    description="API documentation",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="contact@yourapi.local"),
+    license=openapi.License(name="BSD License"),
+)
+
+schema_view = get_schema_view(
+    api_info,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+# The UIs render with an empty schema and fetch the document from ``openapi_json``.
+swagger_ui = schema_view.with_ui('swagger', cache_timeout=0)
+redoc_ui = schema_view.with_ui('redoc', cache_timeout=0)
+
+
+@functools.lru_cache(maxsize=None)
+def generate_schema():
+    """Generate the OpenAPI document once per process."""
+    schema = OpenAPISchemaGenerator(api_info).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def openapi_json(request):
+    schema_file = settings.OPENAPI_SCHEMA_FILE
+    if schema_file.exists():
+        response = FileResponse(open(schema_file, 'rb'), content_type='application/json')
+    else:
+        response = HttpResponse(generate_schema(), content_type='application/json')
+    patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+    return response
@@ -42,7 +42,6 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt.token_blacklist',
     'drf_yasg',
-    'django_cleanup.apps.CleanupConfig',
 ]
 
 MIDDLEWARE = [
@@ -139,6 +138,35 @@ REST_FRAMEWORK = {
     ],
 }
 
+RECOMMENDATIONS_TOP_K = 20
+RECOMMENDATIONS_CHUNK_SIZE = 100000
+RECOMMENDATIONS_BLOCK_SIZE = 1000
+
+ANALYTICS_ROLLUP_BATCH_SIZE = 50000
+ANALYTICS_ROLLUP_LAG = timedelta(minutes=1)
+
+NOTIFICATIONS_UNREAD_LIMIT = 99
+NOTIFICATIONS_UNREAD_CACHE_TIMEOUT = 60
+
+# Swap for 'app.live.RedisBroker' with LIVE_BROKER_OPTIONS = {'url': 'redis://...'} when running several processes.
+LIVE_BROKER = 'app.live.LocalBroker'
+LIVE_BROKER_OPTIONS = {}
+LIVE_COUNTER_INTERVAL = 1.0
+LIVE_HEARTBEAT_INTERVAL = 15
+
+# Written at build time with: python manage.py generate_swagger --overwrite static/openapi.json
+OPENAPI_SCHEMA_FILE = BASE_DIR / 'static' / 'openapi.json'
+OPENAPI_SCHEMA_MAX_AGE = 60 * 60
+
+SWAGGER_SETTINGS = {
+    'DEFAULT_INFO': 'onlinekurs.schema.api_info',
+    'SPEC_URL': 'schema-json',
+}
+
+REDOC_SETTINGS = {
+    'SPEC_URL': 'schema-json',
+}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -13,29 +13,45 @@ Class-based views
 Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
+
+View modules are referenced by dotted path through LazyView/lazy_include so
+that they are imported on the first request that needs them, not at startup.
 """
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-
-schema_view = get_schema_view(
-   openapi.Info(
-      title="Your API",
-      default_version='v1',
-      description="API documentation",
-      terms_of_service="https://www.google.com/policies/terms/",
-      contact=openapi.Contact(email="contact@yourapi.local"),
-      license=openapi.License(name="BSD License"),
-   ),
-   public=True,
-   permission_classes=(permissions.AllowAny,),
-)
+from django.urls import path
+from app.live import lesson_counters_stream
+from .lazy import LazyView, lazy_include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/', include('app.urls')),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    # Explicit api/ routes come before the app.urls include so that resolving
+    # them does not import the main view module.
+    # Async streaming view: serve through onlinekurs.asgi.
+    path('api/lessons/<int:pk>/live/', lesson_counters_stream, name='lesson-live-counters'),
+    path('api/lessons/<int:pk>/related/', LazyView('app.views_recommendations.RelatedLessonsAPIView'),
+         name='lesson-related'),
+    path('api/me/recommended/', LazyView('app.views_recommendations.RecommendedLessonsAPIView'),
+         name='me-recommended'),
+    path('api/me/analytics/lessons/', LazyView('app.views_analytics.AuthorLessonStatsAPIView'),
+         name='me-lesson-stats'),
+    path('api/me/analytics/lessons/<int:pk>/', LazyView('app.views_analytics.AuthorLessonStatsSeriesAPIView'),
+         name='me-lesson-stats-series'),
+    path('api/moderation/<str:target>/', LazyView('app.views_moderation.BulkModerationAPIView'),
+         name='bulk-moderation'),
+    path('api/users/<int:pk>/follow/', LazyView('app.views_notifications.FollowAuthorAPIView'), name='user-follow'),
+    path('api/me/notifications/', LazyView('app.views_notifications.NotificationListAPIView'),
+         name='me-notifications'),
+    path('api/me/notifications/unread-count/', LazyView('app.views_notifications.NotificationUnreadCountAPIView'),
+         name='me-notifications-unread-count'),
+    path('api/me/notifications/read/', LazyView('app.views_notifications.NotificationReadAPIView'),
+         name='me-notifications-read'),
+    path('api/', lazy_include('app.urls')),
 ]
+
+if 'drf_yasg' in settings.INSTALLED_APPS:
+    urlpatterns += [
+        path('openapi.json', LazyView('onlinekurs.schema.openapi_json'), name='schema-json'),
+        path('swagger/', LazyView('onlinekurs.schema.swagger_ui'), name='schema-swagger-ui'),
+        path('redoc/', LazyView('onlinekurs.schema.redoc_ui'), name='schema-redoc'),
+    ]